@@ -1,10 +1,19 @@
-from flask import Flask, request, jsonify, render_template, redirect, url_for, flash
+from flask import Flask, request, render_template, redirect, url_for, flash
+from flask import Response, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import bindparam, lambda_stmt, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import load_only
+from cachetools import TTLCache, cached
+from functools import wraps
 from threading import Lock
 import os
+import random
 import time
 from dotenv import load_dotenv
+from jinja2 import TemplateNotFound
 from decimal import Decimal
+import orjson
 
 # Load environment variables from .env file if available
 load_dotenv()
@@ -14,14 +23,36 @@ app = Flask(__name__)
 # Secret key for flashing messages in the simple UI
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret')
 
-@app.route('/health')
-def health_check():
+def dumps_json(obj):
+    """Serialize ``obj`` to JSON bytes with orjson; Decimals and other unknown types become strings."""
+    return orjson.dumps(obj, default=str, option=orjson.OPT_NAIVE_UTC)
+
+def orjson_response(obj, status=200):
+    """Drop-in replacement for ``jsonify`` that serializes with orjson."""
+    return app.response_class(dumps_json(obj), status=status, mimetype='application/json')
+
+# Probes can hit /health several times a second per pod, so the real database
+# round-trip runs at most once per HEALTH_CHECK_TTL seconds.
+HEALTH_CHECK_TTL = float(os.environ.get('HEALTH_CHECK_TTL', 5))
+
+@cached(TTLCache(maxsize=1, ttl=HEALTH_CHECK_TTL), lock=Lock())
+def ping_database():
+    """Run ``SELECT 1`` against the database; returns None if it succeeds, else the error message."""
     try:
-        # Check database connection
-        db.session.execute('SELECT 1')
-        return jsonify({"status": "healthy"}), 200
+        with db.engine.connect() as connection:
+            connection.execute(text('SELECT 1'))
+        return None
     except Exception as e:
-        return jsonify({"status": "unhealthy", "error": str(e)}), 500
+        return str(e)
+
+@app.route('/health')
+def health_check():
+    # Check database connection (cached) and report connection pool usage
+    error = ping_database()
+    pool_status = db.engine.pool.status()
+    if error:
+        return orjson_response({"status": "unhealthy", "error": error, "pool": pool_status}, 500)
+    return orjson_response({"status": "healthy", "pool": pool_status}, 200)
 
 # --- Database Configuration ---
 db_user = os.environ.get('DB_USER', 'inventory_user')
@@ -32,8 +63,20 @@ db_name = os.environ.get('DB_NAME', 'inventory_db')
 app.config['SQLALCHEMY_DATABASE_URI'] = f"mysql+pymysql://{db_user}:{db_password}@{db_host}/{db_name}"
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Connection pool per worker process. Keep pool_size + max_overflow at or above the
+# number of request threads per process, and (workers x that total) below MySQL's
+# max_connections (151 by default). pool_recycle stays under MySQL's wait_timeout
+# (8 hours by default) and pool_pre_ping drops connections the server has closed.
+# connect_timeout bounds each new connection, including wait_for_mysql() attempts.
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    'pool_size': int(os.environ.get('DB_POOL_SIZE', 20)),
+    'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+    'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+    'pool_pre_ping': True,
+    'connect_args': {'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', 5))},
+}
+
 db = SQLAlchemy(app)
-order_lock = Lock()
 
 # --- Database Models ---
 class Product(db.Model):
@@ -50,100 +93,344 @@ class Order(db.Model):
     customer_id = db.Column(db.Integer, nullable=False)
     order_date = db.Column(db.DateTime, server_default=db.func.now())
     status = db.Column(db.String(50), nullable=False)
-    items = db.relationship('OrderItem', backref='order', cascade="all, delete-orphan")
+    # Order_Items rows are removed by the database's ON DELETE CASCADE instead of being
+    # loaded and deleted one by one
+    items = db.relationship('OrderItem', backref='order', cascade="all, delete-orphan", passive_deletes=True)
 
 class OrderItem(db.Model):
     __tablename__ = 'Order_Items'
+    __table_args__ = (
+        # product_id backs the "is this product referenced?" check in ui_delete_product
+        db.Index('ix_order_items_product_id', 'product_id'),
+        db.Index('ix_order_items_order_id', 'order_id'),
+    )
     order_item_id = db.Column(db.Integer, primary_key=True)
-    order_id = db.Column(db.Integer, db.ForeignKey('Orders.order_id'))
+    order_id = db.Column(db.Integer, db.ForeignKey('Orders.order_id', ondelete='CASCADE'))
     product_id = db.Column(db.Integer, db.ForeignKey('Products.product_id'))
     quantity = db.Column(db.Integer, nullable=False)
     price = db.Column(db.Numeric(10, 2), nullable=False)
 
+# Built once at import; the lambda lets SQLAlchemy skip rebuilding and re-keying the
+# statement on every order and reuse the compiled SQL from its statement cache.
+PRODUCT_PRICES_STMT = lambda_stmt(
+    lambda: select(Product.product_id, Product.price)
+    .where(Product.product_id.in_(bindparam('ids', expanding=True)))
+)
+
+def product_prices(product_ids):
+    """Return ``{product_id: price}`` for the given products, read in one plain (non-locking) query."""
+    rows = db.session.execute(PRODUCT_PRICES_STMT, {'ids': list(set(product_ids))})
+    return {row.product_id: row.price for row in rows}
+
+# UPDATE Products SET stock_quantity = stock_quantity - :qty
+# WHERE product_id = :pid AND stock_quantity >= :qty
+_products = Product.__table__
+_quantity = bindparam('qty')
+DECREMENT_STOCK_STMT = (
+    _products.update()
+    .where(_products.c.product_id == bindparam('pid'))
+    .where(_products.c.stock_quantity >= _quantity)
+    .values(stock_quantity=_products.c.stock_quantity - _quantity)
+)
+
+class InsufficientStock(Exception):
+    """Raised when an ordered product does not exist or has too little stock."""
+    def __init__(self, product_id):
+        super().__init__(f"Insufficient stock for product {product_id}")
+        self.product_id = product_id
+
+MYSQL_ER_LOCK_DEADLOCK = 1213
+
+def retry_on_deadlock(func=None, retries=3, base_delay=0.05):
+    """Roll back and re-run ``func`` when MySQL picks its transaction as a deadlock victim.
+
+    Retries up to ``retries`` times, sleeping a random jittered delay that doubles
+    on each attempt so the competing transactions don't collide again.
+    """
+    if func is None:
+        return lambda f: retry_on_deadlock(f, retries=retries, base_delay=base_delay)
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        for attempt in range(retries + 1):
+            try:
+                return func(*args, **kwargs)
+            except OperationalError as e:
+                db.session.rollback()
+                error_code = e.orig.args[0] if e.orig and e.orig.args else None
+                if error_code != MYSQL_ER_LOCK_DEADLOCK or attempt == retries:
+                    raise
+                time.sleep(random.uniform(0, base_delay * 2 ** attempt))
+    return wrapper
+
+@retry_on_deadlock
+def create_order(customer_id, items):
+    """Place an order for ``items`` and decrement stock in a single transaction.
+
+    Each product's stock is checked and decremented by one conditional UPDATE, so
+    there is no read-modify-write window and no process-wide lock. Rolls back and
+    raises InsufficientStock if any product is missing or short. Returns the new
+    order_id.
+    """
+    # Take row locks in product_id order so concurrent orders can't deadlock
+    items = sorted(items, key=lambda item: item['product_id'])
+    prices = product_prices(item['product_id'] for item in items)
+    order = Order(customer_id=customer_id, status="Processing")
+    db.session.add(order)
+    db.session.flush()  # Ensure order_id is available
+
+    order_item_rows = []
+    for item in items:
+        product_id = item['product_id']
+        quantity = item['quantity']
+        result = db.session.execute(DECREMENT_STOCK_STMT, {'pid': product_id, 'qty': quantity})
+        if product_id not in prices or result.rowcount == 0:
+            db.session.rollback()
+            raise InsufficientStock(product_id)
+        order_item_rows.append({
+            "order_id": order.order_id,
+            "product_id": product_id,
+            "quantity": quantity,
+            "price": prices[product_id]
+        })
+
+    # Insert all order items in one executemany round-trip
+    db.session.execute(OrderItem.__table__.insert(), order_item_rows)
+    order.status = "Completed"
+    order_id = order.order_id
+    db.session.commit()
+    invalidate_report_cache()
+    return order_id
+
+REPORT_PAGE_SIZE = 1000
+
+# Plain column selects for /report and /ui/report. They return lightweight Row tuples,
+# skipping ORM instantiation, and leave out Product.description. The HTML page also
+# gets price, as it did when it was handed full Product objects.
+REPORT_PRODUCTS_STMT = select(Product.product_id, Product.name, Product.stock_quantity)
+UI_REPORT_PRODUCTS_STMT = select(Product.product_id, Product.name, Product.price, Product.stock_quantity)
+REPORT_ORDERS_STMT = select(Order.order_id, Order.customer_id, Order.status, Order.order_date)
+
+def keyset_pages(stmt, key_column, page_size=REPORT_PAGE_SIZE):
+    """Yield the rows of the ``stmt`` select as lists of up to ``page_size``, ordered by ``key_column``.
+
+    Each page is its own short ``WHERE key > :last ORDER BY key LIMIT n`` query, so
+    only one page is read into memory at a time. The session's pooled connection
+    and transaction still stay open until request teardown. The first page is
+    fetched before returning so database errors reach the caller immediately.
+    """
+    stmt = stmt.order_by(key_column)
+
+    def fetch(page_stmt):
+        return db.session.execute(page_stmt.limit(page_size)).all()
+
+    def pages(page):
+        while page:
+            yield page
+            if len(page) < page_size:
+                return
+            last_key = getattr(page[-1], key_column.key)
+            page = fetch(stmt.where(key_column > last_key))
+
+    return pages(fetch(stmt))
+
+# /ui/report renders every row, so its rows are cached per worker for REPORT_CACHE_TTL
+# seconds and repeated page loads share one set of queries; /report keeps streaming from
+# the database. Other workers may serve a snapshot for up to the TTL after a write.
+REPORT_CACHE_TTL = float(os.environ.get('REPORT_CACHE_TTL', 2))
+_report_cache = TTLCache(maxsize=1, ttl=REPORT_CACHE_TTL)
+_report_cache_lock = Lock()
+_report_generation = 0
+
+def invalidate_report_cache():
+    """Discard the cached report snapshot; call after committing any write."""
+    global _report_generation
+    with _report_cache_lock:
+        _report_generation += 1
+        _report_cache.clear()
+
+def report_snapshot():
+    """Return ``(products, orders)`` rows for /ui/report, cached for REPORT_CACHE_TTL seconds.
+
+    The queries run outside the lock, so the snapshot is cached under the write
+    generation read before them. A snapshot that overlapped a write is still returned
+    to its caller but is never stored under, or served for, the newer generation.
+    The rows are shared between requests; don't modify them.
+    """
+    with _report_cache_lock:
+        generation = _report_generation
+        snapshot = _report_cache.get(generation)
+    if snapshot is not None:
+        return snapshot
+    snapshot = (
+        db.session.execute(UI_REPORT_PRODUCTS_STMT.order_by(Product.product_id)).all(),
+        db.session.execute(REPORT_ORDERS_STMT.order_by(Order.order_id)).all(),
+    )
+    with _report_cache_lock:
+        if generation == _report_generation:
+            _report_cache[generation] = snapshot
+    return snapshot
+
 # --- Routes ---
 
+# Checked once at import so a missing template doesn't cost an exception on every hit
+HAS_INDEX_TEMPLATE = os.path.isfile(
+    os.path.join(app.root_path, app.template_folder or 'templates', 'index.html')
+)
+
+TEMPLATE_NAMES = ('index.html', 'add_product.html', 'edit_product.html', 'report.html', 'place_order.html')
+
+def preload_templates(names):
+    """Load and compile the named templates once; any that don't exist are skipped."""
+    templates = {}
+    for name in names:
+        try:
+            templates[name] = app.jinja_env.get_template(name)
+        except TemplateNotFound:
+            pass
+    return templates
+
+# Skipped under FLASK_DEV so edited templates are still picked up by Jinja's auto-reload
+TEMPLATES = {} if os.environ.get('FLASK_DEV') else preload_templates(TEMPLATE_NAMES)
+
+def render(name, **context):
+    """``render_template`` that uses the precompiled template when there is one.
+
+    Passing the Template object keeps Flask's context processors and signals but
+    skips the per-call loader lookup.
+    """
+    return render_template(TEMPLATES.get(name, name), **context)
+
 @app.route('/')
 def index():
     # Render a simple HTML index page if templates are available
+    if HAS_INDEX_TEMPLATE:
+        return render('index.html')
+    return "Hello, Inventory Management System!"
+
+# Bounds of the Products columns: name is VARCHAR(100), price is DECIMAL(10, 2) and
+# stock_quantity is a signed 32-bit INT.
+NAME_MAX_LENGTH = Product.name.type.length
+PRICE_LIMIT = Decimal(10) ** (Product.price.type.precision - Product.price.type.scale)
+PRICE_QUANTUM = Decimal(1).scaleb(-Product.price.type.scale)
+STOCK_MIN, STOCK_MAX = -2 ** 31, 2 ** 31 - 1
+
+def product_values(data):
+    """Whitelist and convert a product payload into Products column values.
+
+    Converting up front means the database never has to cast them. Raises
+    ValueError, with a message fit for the client, if a field is missing, has the
+    wrong type or doesn't fit its column.
+    """
+    name = data.get('name')
+    description = data.get('description', '')
+    price = data.get('price')
+    stock_quantity = data.get('stock_quantity')
+    if not isinstance(name, str) or not name:
+        raise ValueError('name must be a non-empty string')
+    if len(name) > NAME_MAX_LENGTH:
+        raise ValueError(f'name must be at most {NAME_MAX_LENGTH} characters')
+    if description is not None and not isinstance(description, str):
+        raise ValueError('description must be a string or null')
+    # bool is an int subclass, so True/False would otherwise pass as 1/0
+    if not isinstance(price, (int, float, str)) or isinstance(price, bool):
+        raise ValueError('price must be a number')
+    if not isinstance(stock_quantity, (int, float, str)) or isinstance(stock_quantity, bool):
+        raise ValueError('stock_quantity must be an integer')
     try:
-        return render_template('index.html')
-    except Exception:
-        return "Hello, Inventory Management System!"
+        price = Decimal(str(price))
+        stock = Decimal(str(stock_quantity))
+    except ArithmeticError:
+        raise ValueError('price and stock_quantity must be numbers') from None
+    if not price.is_finite():
+        raise ValueError('price must be finite')
+    # Check the magnitude before quantizing too, as quantize() fails on huge exponents
+    if abs(price) >= PRICE_LIMIT or abs(price.quantize(PRICE_QUANTUM)) >= PRICE_LIMIT:
+        raise ValueError(f'price must be less than {PRICE_LIMIT} in magnitude')
+    if not stock.is_finite() or stock != stock.to_integral_value():
+        raise ValueError('stock_quantity must be an integer')
+    if not STOCK_MIN <= stock <= STOCK_MAX:
+        raise ValueError(f'stock_quantity must be between {STOCK_MIN} and {STOCK_MAX}')
+    return {
+        'name': name,
+        'description': description,
+        'price': price.quantize(PRICE_QUANTUM),
+        'stock_quantity': int(stock),
+    }
 
 @app.route('/add_product', methods=['POST'])
 def add_product():
     data = request.get_json()
-    if not data:
-        return jsonify({"error": "Invalid input"}), 400
+    if not data or not isinstance(data, dict):
+        return orjson_response({"error": "Invalid input"}, 400)
+    try:
+        values = product_values(data)
+    except ValueError as e:
+        return orjson_response({"error": str(e)}, 400)
     try:
-        product = Product(
-            name=data.get('name'),
-            description=data.get('description', ''),
-            price=data.get('price'),
-            stock_quantity=data.get('stock_quantity')
-        )
-        db.session.add(product)
+        # Core insert: skips building an ORM object and the unit-of-work flush for one row
+        result = db.session.execute(Product.__table__.insert(), values)
+        product_id = result.inserted_primary_key[0]
         db.session.commit()
-        return jsonify({"message": "Product added", "product_id": product.product_id}), 201
+        invalidate_report_cache()
+        return orjson_response({"message": "Product added", "product_id": product_id}, 201)
     except Exception as e:
         db.session.rollback()
-        return jsonify({"error": str(e)}), 500
+        return orjson_response({"error": str(e)}, 500)
 
 @app.route('/place_order', methods=['POST'])
 def place_order():
     data = request.get_json()
     if not data:
-        return jsonify({"error": "Invalid input"}), 400
+        return orjson_response({"error": "Invalid input"}, 400)
     customer_id = data.get('customer_id')
     items = data.get('items')  # Expected to be a list of {"product_id": ..., "quantity": ...}
     if not customer_id or not items:
-        return jsonify({"error": "Missing customer_id or items"}), 400
-    with order_lock:
-        try:
-            order = Order(customer_id=customer_id, status="Processing")
-            db.session.add(order)
-            db.session.flush()  # Ensure order_id is available
-
-            for item in items:
-                product_id = item.get('product_id')
-                quantity = item.get('quantity')
-                product = Product.query.filter_by(product_id=product_id).with_for_update().first()
-                if product and product.stock_quantity >= quantity:
-                    product.stock_quantity -= quantity
-                    order_item = OrderItem(
-                        order_id=order.order_id,
-                        product_id=product_id,
-                        quantity=quantity,
-                        price=product.price
-                    )
-                    db.session.add(order_item)
-                else:
-                    db.session.rollback()
-                    return jsonify({"error": f"Insufficient stock for product {product_id}"}), 400
-
-            order.status = "Completed"
-            db.session.commit()
-            return jsonify({"message": "Order placed", "order_id": order.order_id}), 201
-        except Exception as e:
-            db.session.rollback()
-            return jsonify({"error": str(e)}), 500
+        return orjson_response({"error": "Missing customer_id or items"}, 400)
+    # bool is an int subclass, so true/false must be rejected explicitly
+    if not all(isinstance(item, dict)
+               and isinstance(item.get('product_id'), int) and not isinstance(item['product_id'], bool)
+               and isinstance(item.get('quantity'), int) and not isinstance(item['quantity'], bool)
+               and item['quantity'] > 0
+               for item in items):
+        return orjson_response({"error": "Each item needs an integer product_id and a positive integer quantity"}, 400)
+    try:
+        order_id = create_order(customer_id, items)
+        return orjson_response({"message": "Order placed", "order_id": order_id}, 201)
+    except InsufficientStock as e:
+        return orjson_response({"error": str(e)}, 400)
+    except Exception as e:
+        db.session.rollback()
+        return orjson_response({"error": str(e)}, 500)
 #hi this is a commit
 @app.route('/report', methods=['GET'])
 def report():
+    # Fetch the first page of each table before the 200 headers go out, so a database
+    # error here still returns a JSON 500. An error on a later page can only truncate
+    # the streamed body.
     try:
-        products = Product.query.all()
-        orders = Order.query.all()
-        product_list = [
-            {"product_id": p.product_id, "name": p.name, "stock_quantity": p.stock_quantity}
-            for p in products
-        ]
-        order_list = [
-            {"order_id": o.order_id, "customer_id": o.customer_id, "status": o.status, "order_date": o.order_date}
-            for o in orders
-        ]
-        return jsonify({"products": product_list, "orders": order_list}), 200
+        product_pages = keyset_pages(REPORT_PRODUCTS_STMT, Product.product_id)
+        order_pages = keyset_pages(REPORT_ORDERS_STMT, Order.order_id)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return orjson_response({"error": str(e)}, 500)
+
+    def json_array(pages):
+        # Hand-written JSON framing so only one page is ever held in memory
+        yield b'['
+        separator = b''
+        for page in pages:
+            yield separator + b','.join(dumps_json(dict(row._mapping)) for row in page)
+            separator = b','
+        yield b']'
+
+    def generate():
+        yield b'{"products": '
+        yield from json_array(product_pages)
+        yield b', "orders": '
+        yield from json_array(order_pages)
+        yield b'}'
+
+    return Response(stream_with_context(generate()), mimetype='application/json'), 200
 
 
 # --- Simple HTML UI routes ---
@@ -169,24 +456,24 @@ def ui_add_product():
             )
             db.session.add(product)
             db.session.commit()
+            invalidate_report_cache()
             flash('Product added successfully', 'success')
             return redirect(url_for('ui_report'))
         except Exception as e:
             db.session.rollback()
             flash(f'Error adding product: {e}', 'danger')
             return redirect(url_for('ui_add_product'))
-    return render_template('add_product.html')
+    return render('add_product.html')
 
 
 @app.route('/ui/report')
 def ui_report():
     try:
-        products = Product.query.all()
-        orders = Order.query.all()
-        return render_template('report.html', products=products, orders=orders)
+        products, orders = report_snapshot()
+        return render('report.html', products=products, orders=orders)
     except Exception as e:
         flash(f'Error loading report: {e}', 'danger')
-        return render_template('report.html', products=[], orders=[])
+        return render('report.html', products=[], orders=[])
 
 
 @app.route('/ui/edit_product/<int:product_id>', methods=['GET', 'POST'])
@@ -206,13 +493,14 @@ def ui_edit_product(product_id):
             if stock_quantity is not None:
                 product.stock_quantity = int(stock_quantity)
             db.session.commit()
+            invalidate_report_cache()
             flash('Product updated successfully', 'success')
             return redirect(url_for('ui_report'))
         except Exception as e:
             db.session.rollback()
             flash(f'Error updating product: {e}', 'danger')
             return redirect(url_for('ui_edit_product', product_id=product_id))
-    return render_template('edit_product.html', product=product)
+    return render('edit_product.html', product=product)
 
 
 @app.route('/ui/delete_product/<int:product_id>', methods=['POST'])
@@ -230,6 +518,7 @@ def ui_delete_product(product_id):
         else:
             db.session.delete(product)
             db.session.commit()
+            invalidate_report_cache()
             flash('Product deleted', 'success')
     except Exception as e:
         db.session.rollback()
@@ -237,96 +526,100 @@ def ui_delete_product(product_id):
     return redirect(url_for('ui_report'))
 
 
+def form_quantities(form):
+    """Yield ``(product_id, quantity)`` for each ``qty_<product_id>`` field with decimal digits."""
+    for key, value in form.items():
+        product_id = key.removeprefix('qty_')
+        value = value.strip()  # int() accepts surrounding whitespace; keep ' 2' working
+        if product_id != key and product_id.isdecimal() and value.isdecimal():
+            yield int(product_id), int(value)
+
+
 @app.route('/ui/place_order', methods=['GET', 'POST'])
 def ui_place_order():
     if request.method == 'POST':
         # Form will submit customer_id and quantities for products
         try:
             customer_id = request.form.get('customer_id') or 0
-            # collect items: form fields named qty_<product_id>
-            items = []
-            for p in Product.query.all():
-                q = request.form.get(f'qty_{p.product_id}')
-                if q:
-                    try:
-                        qty = int(q)
-                    except ValueError:
-                        qty = 0
-                    if qty > 0:
-                        items.append({'product_id': p.product_id, 'quantity': qty})
+            # collect items: form fields named qty_<product_id>. Product ids come from the
+            # field names themselves; create_order() rejects any that don't exist.
+            items = [
+                {'product_id': product_id, 'quantity': quantity}
+                for product_id, quantity in form_quantities(request.form)
+                if quantity > 0
+            ]
 
             if not items:
                 flash('No items selected for the order', 'warning')
                 return redirect(url_for('ui_place_order'))
 
-            # Reuse place_order logic but implement inline to return flashes
-            with order_lock:
-                order = Order(customer_id=int(customer_id), status='Processing')
-                db.session.add(order)
-                db.session.flush()
-                for item in items:
-                    product = Product.query.filter_by(product_id=item['product_id']).with_for_update().first()
-                    if product and product.stock_quantity >= item['quantity']:
-                        product.stock_quantity -= item['quantity']
-                        order_item = OrderItem(
-                            order_id=order.order_id,
-                            product_id=product.product_id,
-                            quantity=item['quantity'],
-                            price=product.price
-                        )
-                        db.session.add(order_item)
-                    else:
-                        db.session.rollback()
-                        flash(f'Insufficient stock for product {item["product_id"]}', 'danger')
-                        return redirect(url_for('ui_place_order'))
-                order.status = 'Completed'
-                db.session.commit()
-                flash(f'Order placed successfully (order id: {order.order_id})', 'success')
-                return redirect(url_for('ui_report'))
+            order_id = create_order(int(customer_id), items)
+            flash(f'Order placed successfully (order id: {order_id})', 'success')
+            return redirect(url_for('ui_report'))
+        except InsufficientStock as e:
+            flash(str(e), 'danger')
+            return redirect(url_for('ui_place_order'))
         except Exception as e:
             db.session.rollback()
             flash(f'Error placing order: {e}', 'danger')
             return redirect(url_for('ui_place_order'))
 
-    products = Product.query.all()
-    return render_template('place_order.html', products=products)
-
-def wait_for_mysql(max_retries=30, delay=2):
-    """Wait for MySQL to be ready before starting the app."""
-    import pymysql
-    for i in range(max_retries):
+    # The order form never shows descriptions, so skip loading the Text column
+    products = Product.query.options(
+        load_only(Product.product_id, Product.name, Product.price, Product.stock_quantity)
+    ).all()
+    return render('place_order.html', products=products)
+
+def wait_for_mysql(timeout=60, base_delay=0.25, max_delay=4, jitter=0.1):
+    """Wait for MySQL to be ready before starting the app.
+
+    Polls with ``SELECT 1`` through the SQLAlchemy engine, backing off exponentially
+    (0.25s, 0.5s, 1s, ... capped at ``max_delay``, plus jitter) until ``timeout``
+    seconds have passed. The successful connection is returned to the engine's pool,
+    so the first request reuses it instead of repeating the handshake.
+    """
+    deadline = time.monotonic() + timeout
+    attempt = 0
+    while True:
+        attempt += 1
         try:
-            # Try to connect to MySQL with the database
             # MySQL container creates the database automatically via MYSQL_DATABASE env var
-            connection = pymysql.connect(
-                host=db_host,
-                user=db_user,
-                password=db_password,
-                database=db_name,
-                connect_timeout=5
-            )
-            connection.close()
+            with db.engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
             print("MySQL is ready!")
             return True
         except Exception as e:
-            if i < max_retries - 1:
-                print(f"Waiting for MySQL... (attempt {i+1}/{max_retries})")
-                time.sleep(delay)
-            else:
-                print(f"Warning: Could not connect to MySQL after {max_retries} retries: {e}")
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                print(f"Warning: Could not connect to MySQL after {attempt} attempts: {e}")
                 print("Continuing anyway - database tables will be created when connection is available")
-    return False
+                return False
+            delay = min(max_delay, base_delay * 2 ** (attempt - 1)) + random.uniform(0, jitter)
+            print(f"Waiting for MySQL... (attempt {attempt}, retrying in {delay:.2f}s)")
+            time.sleep(min(delay, remaining))
 
-if __name__ == '__main__':
-    # Wait for MySQL to be ready (useful in Docker/Kubernetes)
-    wait_for_mysql()
-    
-    # Create database tables if they don't exist
+def warm_pool():
+    """Open a pooled connection with ``SELECT 1`` so the first request skips the MySQL handshake."""
+    try:
+        with db.engine.connect() as connection:
+            connection.execute(text('SELECT 1'))
+    except Exception as e:
+        print(f"Warning: Could not pre-warm the database connection pool: {e}")
+
+def init_db():
+    """Create database tables if they don't exist."""
     with app.app_context():
         try:
             db.create_all()
             print("Database tables created/verified successfully!")
         except Exception as e:
             print(f"Error creating tables: {e}")
-    
-    app.run(host="0.0.0.0", port=5000, debug=True)
+
+if __name__ == '__main__':
+    # Wait for MySQL to be ready (useful in Docker/Kubernetes)
+    wait_for_mysql()
+    init_db()
+
+    # Development server only; containers run the app under gunicorn (see gunicorn.conf.py).
+    # Set FLASK_DEV=1 to enable the debugger and reloader.
+    app.run(host="0.0.0.0", port=5000, debug=bool(os.environ.get('FLASK_DEV')))
@@ -0,0 +1,35 @@
+# Gunicorn configuration for the Inventory Management System.
+# Run with: gunicorn -c gunicorn.conf.py app:app
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+# Threaded workers suit this app: requests spend most of their time waiting on MySQL.
+# Concurrency is workers x threads. Each worker has its own SQLAlchemy pool, so keep
+# DB_POOL_SIZE (+ DB_MAX_OVERFLOW) >= threads, and workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+# below MySQL's max_connections (see DEPLOYMENT.md).
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+
+accesslog = '-'
+
+
+def on_starting(server):
+    """Wait for MySQL and create tables once, in the master, before any worker starts."""
+    from app import init_db, wait_for_mysql
+    wait_for_mysql()
+    init_db()
+
+
+def post_fork(server, worker):
+    """Drop pooled connections inherited from the master; each worker opens its own."""
+    from app import db
+    db.engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    """Open this worker's first pooled connection before it accepts requests."""
+    from app import warm_pool
+    warm_pool()
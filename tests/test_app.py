@@ -1,15 +1,50 @@
+import json
 import os
 import sys
+import warnings
 import pytest
+from sqlalchemy.exc import OperationalError
 
 # Ensure repository root is on sys.path so `import app` works when pytest runs from the tests folder.
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
+import app as app_module
 from app import app
 
 
+@pytest.fixture
+def sqlite_db(monkeypatch):
+    """Point the app at a fresh in-memory SQLite database for the duration of a test."""
+    monkeypatch.setitem(app.config, 'SQLALCHEMY_DATABASE_URI', 'sqlite://')
+    monkeypatch.setitem(app.config, 'SQLALCHEMY_ENGINE_OPTIONS', {})
+    db = app_module.db
+    with app.app_context(), warnings.catch_warnings():
+        # SQLite stores Numeric as float and warns about it; irrelevant to these tests
+        warnings.filterwarnings('ignore', message='Dialect sqlite')
+        db.create_all()
+        yield db
+        db.session.remove()
+        db.drop_all()
+
+
+def _add_products(db, *stock_levels):
+    products = [app_module.Product(name=f'product {i}', price='2.50', stock_quantity=stock)
+                for i, stock in enumerate(stock_levels)]
+    db.session.add_all(products)
+    db.session.commit()
+    return [p.product_id for p in products]
+
+
+def _stock(db, product_id):
+    return db.session.get(app_module.Product, product_id).stock_quantity
+
+
+def _row_counts(db):
+    return app_module.Order.query.count(), app_module.OrderItem.query.count()
+
+
 def test_index_route_returns_200():
     """Basic smoke test: the index route should return HTTP 200."""
     client = app.test_client()
@@ -24,3 +59,250 @@ def test_report_route_returns_json_or_200():
     # The route may try to access the DB and return 500 if no DB is available in CI runner.
     # Accept 200 (OK) or 500 (server error due to missing DB) as valid smoke-test outcomes.
     assert resp.status_code in (200, 500)
+
+
+def test_report_orders_query_error_returns_json_500(sqlite_db, monkeypatch):
+    """A failing orders query is reported as a JSON 500, not a truncated 200 stream."""
+    real_keyset_pages = app_module.keyset_pages
+
+    def failing_orders(stmt, key_column, *args, **kwargs):
+        if key_column is app_module.Order.order_id:
+            raise OperationalError('SELECT ...', {}, Exception(2013, 'Lost connection'))
+        return real_keyset_pages(stmt, key_column, *args, **kwargs)
+
+    monkeypatch.setattr(app_module, 'keyset_pages', failing_orders)
+    resp = app.test_client().get('/report')
+    assert resp.status_code == 500
+    assert 'error' in resp.get_json()
+
+
+def test_retry_on_deadlock_retries_only_deadlocks(monkeypatch):
+    """Deadlocked transactions (MySQL error 1213) are re-run; other errors propagate."""
+    monkeypatch.setattr(app_module.time, 'sleep', lambda seconds: None)
+    calls = []
+
+    @app_module.retry_on_deadlock(retries=2)
+    def flaky(code):
+        calls.append(code)
+        if len(calls) < 3:
+            raise OperationalError('UPDATE ...', {}, Exception(code, 'error'))
+        return 'ok'
+
+    with app.app_context():
+        assert flaky(1213) == 'ok'
+        assert len(calls) == 3
+
+        calls.clear()
+        with pytest.raises(OperationalError):
+            flaky(2013)
+        assert len(calls) == 1
+
+
+def test_health_route_reports_status_and_pool():
+    """Health route should report a status plus pool usage, healthy or not."""
+    client = app.test_client()
+    resp = client.get('/health')
+    assert resp.status_code in (200, 500)
+    body = resp.get_json()
+    assert body['status'] in ('healthy', 'unhealthy')
+    assert 'pool' in body
+
+
+def test_add_product_rejects_invalid_fields():
+    """Malformed product payloads are rejected with 400 before touching the database."""
+    client = app.test_client()
+    for payload in (
+        [1, 2],
+        {'price': 9.99, 'stock_quantity': 1},
+        {'name': 'Laptop', 'description': 42, 'price': 9.99, 'stock_quantity': 1},
+        {'name': 'Laptop', 'price': 'cheap', 'stock_quantity': 1},
+        {'name': 'Laptop', 'price': 'NaN', 'stock_quantity': 1},
+        {'name': 'Laptop', 'price': 'Infinity', 'stock_quantity': 1},
+        {'name': 'Laptop', 'price': True, 'stock_quantity': 1},
+        {'name': 'Laptop', 'price': 9.99, 'stock_quantity': 'many'},
+        {'name': 'Laptop', 'price': 9.99, 'stock_quantity': True},
+        {'name': 'Laptop', 'price': 9.99, 'stock_quantity': 2.9},
+        {'name': 'x' * 101, 'price': 9.99, 'stock_quantity': 1},
+        {'name': 'Laptop', 'price': 1e12, 'stock_quantity': 1},
+        {'name': 'Laptop', 'price': '99999999.999', 'stock_quantity': 1},
+        {'name': 'Laptop', 'price': '1e1000', 'stock_quantity': 1},
+        {'name': 'Laptop', 'price': 9.99, 'stock_quantity': 2 ** 31},
+    ):
+        resp = client.post('/add_product', json=payload)
+        assert resp.status_code == 400
+        assert 'error' in resp.get_json()
+
+
+def test_add_product_error_names_the_bad_field():
+    """The 400 message is the validation error, so clients can tell which field is wrong."""
+    resp = app.test_client().post(
+        '/add_product', json={'name': 'Laptop', 'description': 42, 'price': 9.99, 'stock_quantity': 1}
+    )
+    assert resp.status_code == 400
+    assert resp.get_json() == {'error': 'description must be a string or null'}
+
+
+def test_add_product_inserts_converted_values(sqlite_db):
+    """Valid product payloads are converted to column types and inserted."""
+    resp = app.test_client().post('/add_product', json={'name': 'Laptop', 'price': 999.99, 'stock_quantity': '10'})
+    assert resp.status_code == 201
+    product = sqlite_db.session.get(app_module.Product, resp.get_json()['product_id'])
+    assert (product.name, product.description, str(product.price), product.stock_quantity) == (
+        'Laptop', '', '999.99', 10
+    )
+
+
+def test_add_product_accepts_null_description(sqlite_db):
+    """A null description is stored as NULL, matching the nullable column."""
+    resp = app.test_client().post(
+        '/add_product', json={'name': 'Mouse', 'description': None, 'price': '9.5', 'stock_quantity': 3}
+    )
+    assert resp.status_code == 201
+    product = sqlite_db.session.get(app_module.Product, resp.get_json()['product_id'])
+    assert (product.description, str(product.price)) == (None, '9.50')
+
+
+def test_place_order_rejects_invalid_items():
+    """Items need integer (not bool) product_id and positive integer quantity."""
+    client = app.test_client()
+    for item in (
+        {'product_id': True, 'quantity': 1},
+        {'product_id': 1, 'quantity': True},
+        {'product_id': '1', 'quantity': 1},
+        {'product_id': 1, 'quantity': 0},
+    ):
+        resp = client.post('/place_order', json={'customer_id': 1, 'items': [item]})
+        assert resp.status_code == 400
+
+
+def test_render_uses_precompiled_template(monkeypatch):
+    """Precompiled templates render with Flask's template context intact."""
+    template = app.jinja_env.from_string('{{ greeting }} from {{ request.path }}')
+    monkeypatch.setitem(app_module.TEMPLATES, 'greeting.html', template)
+    with app.test_request_context('/ui'):
+        assert app_module.render('greeting.html', greeting='Hello') == 'Hello from /ui'
+
+
+def test_ui_place_order_skips_unparsable_quantities():
+    """Quantities int() can't parse (e.g. superscript digits) are skipped, not fatal."""
+    client = app.test_client()
+    resp = client.post('/ui/place_order', data={'customer_id': '1', 'qty_1': '²', 'qty_²': '1'})
+    assert resp.status_code == 302
+    with client.session_transaction() as session:
+        assert session['_flashes'] == [('warning', 'No items selected for the order')]
+
+
+def test_ui_place_order_accepts_padded_quantities(sqlite_db):
+    """Quantities with surrounding whitespace are parsed, as int() allows."""
+    (first,) = _add_products(sqlite_db, 5)
+    resp = app.test_client().post('/ui/place_order', data={'customer_id': '1', f'qty_{first}': ' 2 '})
+    assert resp.status_code == 302
+    assert _stock(sqlite_db, first) == 3
+
+
+def test_create_order_decrements_stock_and_records_items(sqlite_db):
+    """A successful order decrements each product's stock and records its items at their prices."""
+    first, second = _add_products(sqlite_db, 5, 3)
+    order_id = app_module.create_order(7, [
+        {'product_id': second, 'quantity': 2},
+        {'product_id': first, 'quantity': 1},
+    ])
+
+    assert (_stock(sqlite_db, first), _stock(sqlite_db, second)) == (4, 1)
+    order = sqlite_db.session.get(app_module.Order, order_id)
+    assert (order.customer_id, order.status) == (7, 'Completed')
+    items = sorted((i.product_id, i.quantity, str(i.price)) for i in order.items)
+    assert items == [(first, 1, '2.50'), (second, 2, '2.50')]
+
+
+def test_create_order_short_stock_rolls_back_everything(sqlite_db):
+    """Short stock on any item rolls back the whole order, including earlier decrements."""
+    first, second = _add_products(sqlite_db, 5, 3)
+    with pytest.raises(app_module.InsufficientStock) as excinfo:
+        app_module.create_order(7, [
+            {'product_id': first, 'quantity': 1},
+            {'product_id': second, 'quantity': 4},
+        ])
+
+    assert excinfo.value.product_id == second
+    assert (_stock(sqlite_db, first), _stock(sqlite_db, second)) == (5, 3)
+    assert _row_counts(sqlite_db) == (0, 0)
+
+
+def test_create_order_unknown_product_is_insufficient_stock(sqlite_db):
+    """An unknown product_id is reported as insufficient stock and rolls the order back."""
+    (first,) = _add_products(sqlite_db, 5)
+    with pytest.raises(app_module.InsufficientStock) as excinfo:
+        app_module.create_order(7, [
+            {'product_id': first, 'quantity': 1},
+            {'product_id': first + 100, 'quantity': 1},
+        ])
+
+    assert excinfo.value.product_id == first + 100
+    assert _stock(sqlite_db, first) == 5
+    assert _row_counts(sqlite_db) == (0, 0)
+
+
+def test_create_order_duplicate_product_ids_share_stock(sqlite_db):
+    """Duplicate product_ids in one order draw from, and are checked against, the same stock."""
+    first, second = _add_products(sqlite_db, 5, 5)
+    app_module.create_order(7, [
+        {'product_id': first, 'quantity': 2},
+        {'product_id': first, 'quantity': 3},
+    ])
+    assert _stock(sqlite_db, first) == 0
+    assert _row_counts(sqlite_db) == (1, 2)
+
+    # Each line fits the stock on its own, but together they exceed it
+    with pytest.raises(app_module.InsufficientStock):
+        app_module.create_order(8, [
+            {'product_id': second, 'quantity': 3},
+            {'product_id': second, 'quantity': 3},
+        ])
+    assert _stock(sqlite_db, second) == 5
+    assert _row_counts(sqlite_db) == (1, 2)
+
+
+def test_report_streams_every_row_across_keyset_pages(sqlite_db):
+    """/report streams every row even when the tables span several keyset pages."""
+    product_ids = _add_products(sqlite_db, *range(5))
+    pages = app_module.keyset_pages(app_module.REPORT_PRODUCTS_STMT, app_module.Product.product_id, page_size=2)
+    assert [[row.product_id for row in page] for page in pages] == [
+        product_ids[:2], product_ids[2:4], product_ids[4:]
+    ]
+
+    resp = app.test_client().get('/report')
+    assert resp.status_code == 200
+    body = json.loads(resp.data)
+    assert [p['product_id'] for p in body['products']] == product_ids
+    assert body['orders'] == []
+
+
+def test_report_snapshot_is_cached_until_a_write(sqlite_db):
+    """Repeated /ui/report reads share one snapshot; a committed write discards it."""
+    app_module.invalidate_report_cache()
+    (first,) = _add_products(sqlite_db, 5)
+    snapshot = app_module.report_snapshot()
+    assert app_module.report_snapshot() is snapshot
+
+    app_module.create_order(7, [{'product_id': first, 'quantity': 2}])
+    products, orders = app_module.report_snapshot()
+    assert [(p.product_id, p.stock_quantity) for p in products] == [(first, 3)]
+    assert len(orders) == 1
+
+
+def test_report_snapshot_overlapping_a_write_is_not_cached(sqlite_db, monkeypatch):
+    """A snapshot whose queries raced with a write is returned but not stored."""
+    app_module.invalidate_report_cache()
+    _add_products(sqlite_db, 5)
+    real_execute = sqlite_db.session.execute
+
+    def execute_during_write(*args, **kwargs):
+        app_module.invalidate_report_cache()  # a write commits while the snapshot is read
+        return real_execute(*args, **kwargs)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(sqlite_db.session, 'execute', execute_during_write)
+        stale = app_module.report_snapshot()
+    assert len(app_module._report_cache) == 0
+    assert app_module.report_snapshot() is not stale